@@ -3,35 +3,86 @@ Debug script to check Azure AD app permissions and token claims
 """
 
 import os
+import sys
 import json
+import time
 import base64
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from azure.identity import ClientSecretCredential
 
-# Load environment
-load_dotenv()
+REQUIRED_ENV_VARS = frozenset({"GRAPH_TENANT_ID", "GRAPH_CLIENT_ID", "GRAPH_CLIENT_SECRET"})
+
+def _env_complete(required) -> bool:
+    """True when every required variable is set to a non-empty value."""
+    return all(os.environ.get(v) for v in required)
+
+def _maybe_load_env(required):
+    """Parse .env only when the process environment doesn't already provide everything."""
+    return None if _env_complete(required) else load_dotenv()
+
+GRAPH_SCOPE = "https://graph.microsoft.com/.default"
+
+_credential = None
+
+def _get_cred():
+    """
+    Return a process-wide credential.
+    
+    Deliberately uses no persistent token cache: this script checks roles after
+    admin consent, so it must decode a freshly issued token every run.
+    """
+    global _credential
+    if _credential is None:
+        # Imported lazily: azure-identity pulls in msal/cryptography, which is
+        # wasted work on the missing-env-vars exit path
+        from azure.identity import ClientSecretCredential
+        _credential = ClientSecretCredential(
+            tenant_id=os.environ["GRAPH_TENANT_ID"],
+            client_id=os.environ["GRAPH_CLIENT_ID"],
+            client_secret=os.environ["GRAPH_CLIENT_SECRET"],
+        )
+    return _credential
 
 def decode_jwt_payload(token: str) -> dict:
     """Decode JWT payload (claims)"""
     try:
-        # Split the token into parts
-        header_b64, payload_b64, signature_b64 = token.split(".")
-        
-        # Add padding if needed
-        payload_b64 += '=' * (-len(payload_b64) % 4)
-        
-        # Decode the payload
-        payload_bytes = base64.urlsafe_b64decode(payload_b64)
-        payload = json.loads(payload_bytes.decode('utf-8'))
-        
-        return payload
+        # Over-padding is accepted by urlsafe_b64decode and json.loads takes bytes directly
+        _, payload_b64, _ = token.split(".", 2)
+        return json.loads(base64.urlsafe_b64decode(payload_b64 + "==="))
     except Exception as e:
         print(f"Error decoding JWT: {e}")
         return {}
 
+def _fmt_plain(key, value) -> list:
+    return [f"{key:15}: {value}"]
+
+def _fmt_roles(key, value) -> list:
+    lines = [f"{key:15}: {value}"]
+    if isinstance(value, list) and value:
+        lines.extend(f"                 - {role}" for role in value)
+    elif not value:
+        lines.append("                 (empty list)")
+    return lines
+
+def _fmt_time(key, value) -> list:
+    return [f"{key:15}: {value} ({time.strftime('%Y-%m-%d %H:%M:%S+00:00', time.gmtime(value))})"]
+
+# Claims shown in the report and their formatters (anything else uses _fmt_plain)
+SHOWN_CLAIMS = frozenset({'aud', 'iss', 'tid', 'appid', 'sub', 'iat', 'exp', 'nbf', 'roles'})
+CLAIM_FORMATTERS = {'roles': _fmt_roles, 'iat': _fmt_time, 'exp': _fmt_time, 'nbf': _fmt_time}
+
 def main():
+    _maybe_load_env(REQUIRED_ENV_VARS)
     print("=== Azure AD App Permissions Debug ===\n")
     
+    # Start the token request up front so its network round-trip overlaps
+    # the local output below
+    token_future = None
+    if _env_complete(REQUIRED_ENV_VARS):
+        executor = ThreadPoolExecutor(max_workers=1)
+        token_future = executor.submit(lambda: _get_cred().get_token(GRAPH_SCOPE))
+        executor.shutdown(wait=False)
+    
     # Check environment variables
     tenant_id = os.getenv("GRAPH_TENANT_ID")
     client_id = os.getenv("GRAPH_CLIENT_ID")
@@ -42,79 +93,68 @@ def main():
     print(f"Client Secret: {'*' * 20 if client_secret else 'NOT SET'}")
     print()
     
-    if not all([tenant_id, client_id, client_secret]):
+    if token_future is None:
         print("❌ Missing required environment variables!")
         return
     
+    # The report is composed in memory and written once; only the progress
+    # line and error output go straight to stdout
+    out = []
+    p = out.append
     try:
-        # Create credential
-        credential = ClientSecretCredential(
-            tenant_id=tenant_id,
-            client_id=client_id,
-            client_secret=client_secret
-        )
-        
-        # Request token
+        # Request a fresh token
         print("🔑 Requesting access token...")
-        scope = "https://graph.microsoft.com/.default"
-        token_response = credential.get_token(scope)
+        token_response = token_future.result(timeout=30)
         
-        print(f"✅ Token acquired successfully")
-        print(f"Token expires at: {token_response.expires_on}")
-        print()
+        p(f"✅ Token acquired successfully")
+        p(f"Token expires at: {token_response.expires_on}")
+        p("")
         
         # Decode token
         payload = decode_jwt_payload(token_response.token)
         
         if payload:
-            print("=== Token Claims ===")
+            p("=== Token Claims ===")
             for key, value in sorted(payload.items()):
-                if key == 'roles':
-                    print(f"{key:15}: {value}")
-                    if isinstance(value, list) and value:
-                        for role in value:
-                            print(f"                 - {role}")
-                    elif not value:
-                        print(f"                 (empty list)")
-                elif key in ['aud', 'iss', 'tid', 'appid', 'sub', 'iat', 'exp', 'nbf']:
-                    if key in ['iat', 'exp', 'nbf']:
-                        import datetime
-                        dt = datetime.datetime.fromtimestamp(value, tz=datetime.timezone.utc)
-                        print(f"{key:15}: {value} ({dt})")
-                    else:
-                        print(f"{key:15}: {value}")
-            print()
+                if key not in SHOWN_CLAIMS:
+                    continue
+                out.extend(CLAIM_FORMATTERS.get(key, _fmt_plain)(key, value))
+            p("")
             
             # Check required roles
             required_roles = ["Calendars.ReadWrite", "User.Read.All"]
             token_roles = payload.get('roles', [])
             
-            print("=== Permission Check ===")
+            p("=== Permission Check ===")
             for role in required_roles:
                 if role in token_roles:
-                    print(f"✅ {role}")
+                    p(f"✅ {role}")
                 else:
-                    print(f"❌ {role} - MISSING")
+                    p(f"❌ {role} - MISSING")
             
             if not token_roles:
-                print("\n⚠️  NO ROLES FOUND IN TOKEN!")
-                print("This usually means:")
-                print("1. Application permissions haven't been granted admin consent")
-                print("2. The app registration doesn't have the required API permissions")
-                print("3. There's a delay in permission propagation")
-                print("4. Token was cached before permissions were granted")
-                print("\n🔧 NEXT STEPS:")
-                print("1. Ask IT to click 'Grant admin consent' button in Azure portal")
-                print("2. Wait 5-10 minutes for Azure AD to propagate changes")
-                print("3. Clear any token caches and retry")
-                print(f"4. Verify permissions at: https://portal.azure.com/#view/Microsoft_AAD_RegisteredApps/ApplicationMenuBlade/~/CallAnAPI/appId/{client_id}")
-                print("\n📋 Required Application Permissions:")
-                print("   • Microsoft Graph > Calendars.ReadWrite (Application)")
-                print("   • Microsoft Graph > User.Read.All (Application)")
-                print("   • Microsoft Graph > MailboxSettings.Read (Application)")
-                print("\n⚠️  Make sure these are APPLICATION permissions, not DELEGATED!")
+                p("\n⚠️  NO ROLES FOUND IN TOKEN!")
+                p("This usually means:")
+                p("1. Application permissions haven't been granted admin consent")
+                p("2. The app registration doesn't have the required API permissions")
+                p("3. There's a delay in permission propagation")
+                p("4. Token was cached before permissions were granted")
+                p("\n🔧 NEXT STEPS:")
+                p("1. Ask IT to click 'Grant admin consent' button in Azure portal")
+                p("2. Wait 5-10 minutes for Azure AD to propagate changes")
+                p("3. Clear any token caches and retry")
+                p(f"4. Verify permissions at: https://portal.azure.com/#view/Microsoft_AAD_RegisteredApps/ApplicationMenuBlade/~/CallAnAPI/appId/{client_id}")
+                p("\n📋 Required Application Permissions:")
+                p("   • Microsoft Graph > Calendars.ReadWrite (Application)")
+                p("   • Microsoft Graph > User.Read.All (Application)")
+                p("   • Microsoft Graph > MailboxSettings.Read (Application)")
+                p("\n⚠️  Make sure these are APPLICATION permissions, not DELEGATED!")
+        
+        sys.stdout.write("\n".join(out) + "\n")
                 
     except Exception as e:
+        if out:
+            sys.stdout.write("\n".join(out) + "\n")
         print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
@@ -1,10 +1,19 @@
 """
 Current datetime tool for Azure AI agents to get real-time date information
 """
+import os
 import json
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from typing import Dict, Any
 
+# Singapore Standard Time (UTC+8), the primary timezone reported by the tool
+SINGAPORE_TZ = timezone(timedelta(hours=8))
+
+# English names indexed by weekday()/month-1; avoids locale-dependent strftime lookups
+_DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_MONTH_NAMES = ("January", "February", "March", "April", "May", "June", "July",
+                "August", "September", "October", "November", "December")
+
 def get_current_datetime(timezone_name: str = "UTC") -> Dict[str, Any]:
     """
     Get the current date and time information.
@@ -16,30 +25,35 @@ def get_current_datetime(timezone_name: str = "UTC") -> Dict[str, Any]:
         Dict containing current datetime information
     """
     try:
-        # Get current time in Singapore timezone (UTC+8) 
-        from datetime import timezone, timedelta
-        singapore_tz = timezone(timedelta(hours=8))
-        now_singapore = datetime.now(singapore_tz)
+        # Sample the clock once and derive Singapore time (UTC+8) from it,
+        # so both values describe the same instant
         now_utc = datetime.now(timezone.utc)
+        now_singapore = now_utc.astimezone(SINGAPORE_TZ)
+        
+        # Print for visibility (opt-in via DATETIME_TOOL_TRACE)
+        if __debug__ and os.getenv("DATETIME_TOOL_TRACE"):
+            print(f"📅 API Call: get_current_datetime()")
+            print(f"📅 Current Date/Time: {now_singapore.strftime('%B %d, %Y at %H:%M:%S SGT')}")
         
-        # Print for visibility
-        print(f"📅 API Call: get_current_datetime()")
-        print(f"📅 Current Date/Time: {now_singapore.strftime('%B %d, %Y at %H:%M:%S SGT')} | UTC: {now_utc.strftime('%B %d, %Y at %H:%M:%S UTC')}")
+        # Derive every field from the datetime attributes once
+        iso_date = f"{now_singapore.year:04d}-{now_singapore.month:02d}-{now_singapore.day:02d}"
+        month_name = _MONTH_NAMES[now_singapore.month - 1]
+        iso_singapore = now_singapore.isoformat()
         
         # Return comprehensive datetime information using Singapore time as primary
         return {
             "status": "success",
             "current_datetime_utc": now_utc.isoformat(),
-            "current_datetime_singapore": now_singapore.isoformat(),
-            "current_date": now_singapore.strftime("%Y-%m-%d"),
-            "current_time": now_singapore.strftime("%H:%M:%S"),
-            "day_of_week": now_singapore.strftime("%A"),
-            "month_name": now_singapore.strftime("%B"),
+            "current_datetime_singapore": iso_singapore,
+            "current_date": iso_date,
+            "current_time": f"{now_singapore.hour:02d}:{now_singapore.minute:02d}:{now_singapore.second:02d}",
+            "day_of_week": _DAY_NAMES[now_singapore.weekday()],
+            "month_name": month_name,
             "year": now_singapore.year,
-            "formatted_date": now_singapore.strftime("%B %d, %Y"),
+            "formatted_date": f"{month_name} {now_singapore.day:02d}, {now_singapore.year}",
             "timezone": "Singapore Standard Time",
-            "iso_date": now_singapore.strftime("%Y-%m-%d"),
-            "iso_datetime": now_singapore.isoformat()
+            "iso_date": iso_date,
+            "iso_datetime": iso_singapore
         }
         
     except Exception as e:
@@ -1,19 +1,43 @@
 """
 Enhanced Azure AI Foundry agent implementation with proper error handling,
 logging, and production-ready features.
+
+Set VSPOC_DEMO_PACE (seconds, default 0) to pause between the demo
+results printed by main(), e.g. VSPOC_DEMO_PACE=2 for a live presentation.
 """
 import os
+import re
+import sys
 import time
 import json
+import hashlib
+import queue
+import inspect
+import pathlib
+import atexit
 import logging
-from typing import Dict, Any, List
-from dotenv import load_dotenv
-from azure.identity import DefaultAzureCredential
-from azure.ai.projects import AIProjectClient
-from azure.ai.agents.models import FunctionTool
+import logging.handlers
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from improved_tools import read_schedule, create_meeting
 from datetime_tool import get_current_datetime
 
+# Use orjson for tool payloads when available; the stdlib fallback stays compact
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+    _loads = json.loads
+
 # Configure logging - detailed logs to file, minimal to console
 file_handler = logging.FileHandler('agent_operations.log')
 file_handler.setLevel(logging.DEBUG)
@@ -23,51 +47,402 @@ console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.WARNING)  # Only warnings and errors to console
 console_handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
 
+# File writes happen on a background listener thread; logging calls only enqueue
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, file_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
-logger.addHandler(file_handler)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
 logger.addHandler(console_handler)
 
-# Load environment variables
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
+REQUIRED_ENV_VARS = frozenset({"PROJECT_ENDPOINT", "MODEL_DEPLOYMENT_NAME"})
+
+# Load environment variables; .env is only parsed if the environment lacks them
+_ENV_PATH = pathlib.Path(__file__).resolve().parents[1] / '.env'
+if not all(os.environ.get(v) for v in REQUIRED_ENV_VARS):
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_PATH)
 
-# Validate required environment variables
-REQUIRED_ENV_VARS = ["PROJECT_ENDPOINT", "MODEL_DEPLOYMENT_NAME"]
-missing_vars = [var for var in REQUIRED_ENV_VARS if not os.environ.get(var)]
+# Validate required environment variables (an empty value counts as missing)
+missing_vars = {v for v in REQUIRED_ENV_VARS if not os.environ.get(v)}
 if missing_vars:
-    raise ValueError(f"Missing required environment variables: {missing_vars}")
+    raise ValueError(f"Missing required environment variables: {sorted(missing_vars)}")
+
+# Agent configuration is constant for the process, so build it once at import
+MODEL_DEPLOYMENT_NAME = os.environ["MODEL_DEPLOYMENT_NAME"]
+PROJECT_ENDPOINT = os.environ["PROJECT_ENDPOINT"]
+AGENT_INSTRUCTIONS = (
+    "You are a professional calendar assistant that helps users manage their schedules. "
+    "ALWAYS call get_current_datetime() first to get the current date and time before answering any questions. "
+    "Use the returned date information for all relative date calculations (today, tomorrow, next week, etc.). "
+    "IMPORTANT: For schedule queries, you MUST format each event EXACTLY as follows (with no changes or additions):"
+    "\n1. **<Event Title>**"
+    "\n   - **Time:** <Start Time> to <End Time>"
+    "\n   - **Location:** <Location>"
+    "\n   - **Organiser:** <Organiser Name> (<Organiser Email>)"
+    "\n"
+    "The organizer information is in the response under event.organizer.emailAddress.name and event.organizer.emailAddress.address."
+    "\n"
+    "IMPORTANT: When booking meetings, you MUST summarize all meeting details to the user in a clear, formatted block and ask for explicit confirmation. You must wait for the user to type 'yes' to proceed with booking or 'no' to cancel. Do not call create_meeting until receiving a 'yes'."
+    "Always provide clear, concise responses with timezone information. "
+    "Handle errors gracefully and inform users of any issues. "
+)
+
+_TOOL_FUNCTIONS = (read_schedule, create_meeting, get_current_datetime)
+_TOOL_DISPATCH = {fn.__name__: fn for fn in _TOOL_FUNCTIONS}
+# Signatures used to reject bad argument sets before a tool does any Graph work
+_TOOL_SIGNATURES = {fn.__name__: inspect.signature(fn) for fn in _TOOL_FUNCTIONS}
+
+# The Azure SDK packages are imported on first use so scripts that never talk
+# to Azure AI (or only import this module) skip their import cost
+@functools.lru_cache(maxsize=None)
+def _get_tools():
+    """Return the shared FunctionTool for the calendar tools."""
+    from azure.ai.agents.models import FunctionTool
+    return FunctionTool(functions=set(_TOOL_FUNCTIONS))
+
+# Tool calls are I/O-bound Graph requests; one shared pool runs a step's calls in parallel
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool-call")
+
+# Run polling: start fast and back off exponentially, bounded by a wall-clock timeout
+RUN_TIMEOUT_SECONDS = 300  # Generous budget for complex calendar operations
+POLL_INITIAL_DELAY = 0.05
+POLL_MAX_DELAY = 1.0
+POLL_BACKOFF = 1.5
+STATUS_LOG_INTERVAL = 10  # seconds between run-status debug logs
+_ACTIVE_STATUSES = frozenset({"queued", "in_progress", "requires_action"})  # run still working
+
+# Error classification: one case-insensitive scan per error string. Phrases are
+# word-bounded so words like "generate" or "token limit" are not misread
+_ERROR_RE = re.compile(
+    r"(?P<rate_limit>\brate[ _-]?limit|\b429\b|too many requests|throttl)"
+    r"|(?P<quota>\bquota\b|\busage[ _-]?limit)",
+    re.IGNORECASE
+)
+
+def _classify_error(err_text: str) -> str:
+    """
+    Return the error category for err_text: "rate_limit", "quota" or "unexpected".
+    
+    >>> _classify_error("Rate limit is exceeded. Try again in 20 seconds.")
+    'rate_limit'
+    >>> _classify_error("HTTP 429 Too Many Requests")
+    'rate_limit'
+    >>> _classify_error("Insufficient quota for this deployment")
+    'quota'
+    >>> _classify_error("Failed to generate a response")
+    'unexpected'
+    >>> _classify_error("token limit exceeded")
+    'unexpected'
+    >>> _classify_error("Invalid usage of parameter 'top'")
+    'unexpected'
+    """
+    kinds = {m.lastgroup for m in _ERROR_RE.finditer(err_text)}
+    if "rate_limit" in kinds:
+        return "rate_limit"
+    if "quota" in kinds:
+        return "quota"
+    return "unexpected"
+
+# Message prefixes for runs that finish with status "failed"
+_RUN_FAILED_PREFIXES = {
+    "rate_limit": "Rate limit hit",
+    "quota": "Quota/Usage limit hit",
+    "unexpected": "Run failed",
+}
+
+# Static parts of the error responses returned by process_message
+_ERROR_TEMPLATES = {
+    "rate_limit": {
+        "status": "error",
+        "message": "Rate limit exceeded. Please wait and try again.",
+        "error_type": "rate_limit"
+    },
+    "quota": {
+        "status": "error",
+        "message": "Service quota exceeded. Please check your Azure AI usage.",
+        "error_type": "quota"
+    },
+    "unexpected": {
+        "status": "error",
+        "message": "An unexpected error occurred while processing your request.",
+        "error_type": "unexpected"
+    },
+}
+
+# Optional pause between demo results in main(); 0 keeps automated runs fast
+_pace = float(os.environ.get("VSPOC_DEMO_PACE", "0"))
+
+# Agent IDs persisted across runs, keyed by model deployment and agent name
+AGENT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "vspoc", "agent_id.json")
+
+def _read_agent_cache() -> Dict[str, str]:
+    try:
+        with open(AGENT_CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _agent_cache_key(name: str, tool_defs) -> str:
+    """
+    Cache key for a persisted agent.
+    
+    Covers everything the agent was created with, so a change of endpoint,
+    model, instructions or tools creates a new agent instead of reusing a stale one.
+    """
+    definition = json.dumps(
+        {"instructions": AGENT_INSTRUCTIONS, "tools": [d.as_dict() for d in tool_defs]},
+        sort_keys=True
+    )
+    digest = hashlib.sha256(definition.encode("utf-8")).hexdigest()[:16]
+    return f"{PROJECT_ENDPOINT}|{MODEL_DEPLOYMENT_NAME}|{name}|{digest}"
+
+def _write_agent_cache(cache: Dict[str, str]) -> None:
+    try:
+        os.makedirs(os.path.dirname(AGENT_CACHE_PATH), exist_ok=True)
+        with open(AGENT_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        logger.warning("Could not persist agent cache: %s", e)
+
+_CREDENTIAL = None
+_PROJECT_CLIENT = None
+_PROJECT_CLIENT_REFS = 0  # CalendarAgent instances currently holding the client
+_CLIENT_LOCK = threading.RLock()
+
+def _build_credential():
+    """
+    Build the Azure AI credential selected by AZURE_CREDENTIAL_TYPE.
+    
+    "managed", "env" and "cli" pick that single credential so startup skips
+    the probing of the full DefaultAzureCredential chain; "dev" keeps the
+    chain but drops the managed-identity and workload-identity probes that
+    stall on developer machines. Anything else uses DefaultAzureCredential.
+    """
+    from azure.identity import (
+        AzureCliCredential,
+        DefaultAzureCredential,
+        EnvironmentCredential,
+        ManagedIdentityCredential,
+    )
+    
+    kind = os.getenv("AZURE_CREDENTIAL_TYPE", "").strip().lower()
+    if kind == "managed":
+        return ManagedIdentityCredential(client_id=os.environ.get("AZURE_CLIENT_ID"))
+    if kind == "env":
+        return EnvironmentCredential()
+    if kind == "cli":
+        return AzureCliCredential()
+    if kind == "dev":
+        return DefaultAzureCredential(
+            exclude_managed_identity_credential=True,
+            exclude_workload_identity_credential=True,
+        )
+    return DefaultAzureCredential()
+
+def _build_transport():
+    """
+    Build the HTTP transport for the project client.
+    
+    One requests session with a bounded connection pool keeps TLS connections
+    alive across the message, run and tool-output calls of every turn. The
+    adapter keeps urllib3's default of no retries: azure-core's RetryPolicy
+    already retries failed requests, and stacking both would multiply attempts.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from azure.core.pipeline.transport import RequestsTransport
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=50)
+    session.mount("https://", adapter)
+    return RequestsTransport(session=session, connection_timeout=10, read_timeout=60)
+
+def _get_project_client():
+    """
+    Return the process-wide AIProjectClient.
+    
+    The client, its pooled HTTP transport and its credential (with its token
+    cache) are shared by every CalendarAgent, so credential discovery and
+    connection setup run once per process. CalendarAgent instances hold it
+    through _acquire_project_client()/_release_project_client(); never close
+    the returned client directly.
+    """
+    global _CREDENTIAL, _PROJECT_CLIENT
+    if _PROJECT_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _PROJECT_CLIENT is None:
+                from azure.ai.projects import AIProjectClient
+                _CREDENTIAL = _build_credential()
+                _PROJECT_CLIENT = AIProjectClient(
+                    endpoint=PROJECT_ENDPOINT, 
+                    credential=_CREDENTIAL,
+                    transport=_build_transport()
+                )
+    return _PROJECT_CLIENT
+
+def _acquire_project_client():
+    """Return the shared AIProjectClient and count one more holder of it."""
+    global _PROJECT_CLIENT_REFS
+    with _CLIENT_LOCK:
+        client = _get_project_client()
+        _PROJECT_CLIENT_REFS += 1
+        return client
+
+def _release_project_client() -> None:
+    """Drop one holder of the shared client, closing it when none remain."""
+    global _PROJECT_CLIENT_REFS
+    with _CLIENT_LOCK:
+        _PROJECT_CLIENT_REFS = max(_PROJECT_CLIENT_REFS - 1, 0)
+        if _PROJECT_CLIENT_REFS == 0:
+            _close_project_client()
+
+def _close_project_client() -> None:
+    """Close the shared AIProjectClient (and its pooled sockets); the next use builds a new one."""
+    global _CREDENTIAL, _PROJECT_CLIENT
+    with _CLIENT_LOCK:
+        if _PROJECT_CLIENT is not None:
+            _PROJECT_CLIENT.close()
+            _PROJECT_CLIENT = None
+            _CREDENTIAL = None
+
+# Whatever is still open (e.g. the get_agent() singleton's client) is closed at exit
+atexit.register(_close_project_client)
+
+# Scope requested by the project client for Azure AI Foundry calls
+AI_TOKEN_SCOPE = "https://ai.azure.com/.default"
+
+def _prefetch_token(credential) -> None:
+    """Warm the credential's token cache in the background."""
+    def _warm():
+        try:
+            credential.get_token(AI_TOKEN_SCOPE)
+            logger.debug("Azure AI token prefetched")
+        except Exception as e:
+            # The first real request will retry and surface the error
+            logger.debug("Azure AI token prefetch failed: %s", e)
+    threading.Thread(target=_warm, name="token-prefetch", daemon=True).start()
+
+def _message_text(message) -> Optional[str]:
+    """Return the first text content of an agent message, if any."""
+    text_item = next(
+        (item for item in (getattr(message, 'content', None) or ()) if getattr(item, 'text', None)), 
+        None
+    )
+    return text_item.text.value if text_item else None
+
+class _RunStreamHandler:
+    """
+    Stream event handler that runs tool calls inline and captures the final reply.
+    
+    Combined with AgentEventHandler by _stream_handler_type(); instantiate that.
+    """
+    
+    def __init__(self, calendar_agent: "CalendarAgent", verbose: bool = False):
+        super().__init__()
+        self.calendar_agent = calendar_agent
+        self.run = None
+        self.text = None
+        # Status pings are only useful to someone watching a terminal
+        self._echo = verbose and sys.stdout.isatty()
+        self._start = self._last_echo = time.monotonic()
+        
+    def echo_status(self) -> None:
+        """Periodically echo the run status to stdout once the run has taken over 20 seconds."""
+        if not self._echo or self.run is None:
+            return
+        now = time.monotonic()
+        if now - self._start > 20 and now - self._last_echo >= STATUS_LOG_INTERVAL:
+            self._last_echo = now
+            sys.stdout.write(f" [Status: {self.run.status}]")
+            sys.stdout.flush()
+        
+    def on_thread_run(self, run) -> None:
+        self.run = run
+        logger.debug("Run %s status: %s", run.id, run.status)
+        if run.status == "requires_action":
+            tool_calls = run.required_action.submit_tool_outputs.tool_calls
+            tool_outputs = self.calendar_agent._handle_tool_calls(tool_calls)
+            if tool_outputs:
+                # Continue streaming the resumed run through this same handler
+                self.calendar_agent.project.agents.runs.submit_tool_outputs_stream(
+                    thread_id=run.thread_id, 
+                    run_id=run.id, 
+                    tool_outputs=tool_outputs, 
+                    event_handler=self
+                )
+                
+    def on_thread_message(self, message) -> None:
+        if message.role == "assistant" and message.status == "completed":
+            self.text = _message_text(message)
+            
+    def on_error(self, data: str) -> None:
+        logger.error("Run stream error: %s", data)
+
+@functools.lru_cache(maxsize=None)
+def _stream_handler_type():
+    """Return _RunStreamHandler mixed into the SDK's AgentEventHandler."""
+    from azure.ai.agents.models import AgentEventHandler
+    return type("RunStreamHandler", (_RunStreamHandler, AgentEventHandler), {})
 
 class CalendarAgent:
     """Enhanced Calendar Agent with proper error handling and logging."""
     
     def __init__(self):
-        """Initialize the Calendar Agent."""
-        self.project = None
+        """
+        Initialize the Calendar Agent.
+        
+        The project client is created on first use of ``project``.
+        """
         self.agent = None
         self.tools = None
+        self._tool_defs = None
+        self._default_thread_id: Optional[str] = None
+        self._default_thread_lock = threading.Lock()
         self._initialize_tools()
-        self._initialize_client()
         
     def _initialize_tools(self):
-        """Initialize function tools."""
-        try:
-            self.tools = FunctionTool(functions={read_schedule, create_meeting, get_current_datetime})
-            logger.debug("Function tools initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize function tools: {e}")
-            raise
+        """Initialize function tools (shared, built once per process)."""
+        self.tools = _get_tools()
+        self._tool_defs = self.tools.definitions
+            
+    def __enter__(self) -> "CalendarAgent":
+        return self
+        
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+        
+    def close(self) -> None:
+        """
+        Release this instance's hold on the shared project client.
+        
+        The client (and its idle connections) is closed once the last
+        CalendarAgent using it is closed; other instances are unaffected.
+        """
+        if "project" in self.__dict__:
+            del self.__dict__["project"]
+            _release_project_client()
             
-    def _initialize_client(self):
-        """Initialize Azure AI Project Client."""
+    @functools.cached_property
+    def project(self):
+        """
+        Azure AI Project Client, initialized on first access.
+        
+        The first holder of the shared client also starts fetching its
+        Azure AI token in the background.
+        """
         try:
-            credential = DefaultAzureCredential()
-            self.project = AIProjectClient(
-                endpoint=os.environ["PROJECT_ENDPOINT"], 
-                credential=credential
-            )
+            with _CLIENT_LOCK:
+                project = _acquire_project_client()
+                if _PROJECT_CLIENT_REFS == 1:
+                    _prefetch_token(_CREDENTIAL)
             logger.debug("Azure AI Project Client initialized successfully")
+            return project
         except Exception as e:
-            logger.error(f"Failed to initialize Azure AI Project Client: {e}")
+            logger.error("Failed to initialize Azure AI Project Client: %s", e)
             raise
             
     def create_agent(self, name: str = "CalendarAgent") -> str:
@@ -82,34 +457,51 @@ class CalendarAgent:
         """
         try:
             agent_obj = self.project.agents.create_agent(
-                model=os.environ["MODEL_DEPLOYMENT_NAME"],
+                model=MODEL_DEPLOYMENT_NAME,
                 name=name,
-                instructions=(
-                    "You are a professional calendar assistant that helps users manage their schedules. "
-                    "ALWAYS call get_current_datetime() first to get the current date and time before answering any questions. "
-                    "Use the returned date information for all relative date calculations (today, tomorrow, next week, etc.). "
-                    "IMPORTANT: For schedule queries, you MUST format each event EXACTLY as follows (with no changes or additions):"
-                    "\n1. **<Event Title>**"
-                    "\n   - **Time:** <Start Time> to <End Time>"
-                    "\n   - **Location:** <Location>"
-                    "\n   - **Organiser:** <Organiser Name> (<Organiser Email>)"
-                    "\n"
-                    "The organizer information is in the response under event.organizer.emailAddress.name and event.organizer.emailAddress.address."
-                    "\n"
-                    "IMPORTANT: When booking meetings, you MUST summarize all meeting details to the user in a clear, formatted block and ask for explicit confirmation. You must wait for the user to type 'yes' to proceed with booking or 'no' to cancel. Do not call create_meeting until receiving a 'yes'."
-                    "Always provide clear, concise responses with timezone information. "
-                    "Handle errors gracefully and inform users of any issues. "
-                ),
-                tools=self.tools.definitions,
+                instructions=AGENT_INSTRUCTIONS,
+                tools=self._tool_defs,
             )
             self.agent = agent_obj
-            logger.debug(f"Agent '{name}' created successfully with ID: {agent_obj.id}")
+            logger.debug("Agent '%s' created successfully with ID: %s", name, agent_obj.id)
             return agent_obj.id
             
         except Exception as e:
-            logger.error(f"Failed to create agent: {e}")
+            logger.error("Failed to create agent: %s", e)
             raise
             
+    def load_or_create_agent(self, name: str = "CalendarAgent") -> str:
+        """
+        Reuse the agent persisted by a previous run, creating one only if needed.
+        
+        The cached agent is replaced only if the service reports it deleted;
+        any other error from the lookup is raised.
+        
+        Args:
+            name: Name for the agent
+            
+        Returns:
+            Agent ID
+        """
+        from azure.core.exceptions import ResourceNotFoundError
+        
+        key = _agent_cache_key(name, self._tool_defs)
+        cache = _read_agent_cache()
+        cached_id = cache.get(key)
+        if cached_id:
+            try:
+                self.agent = self.project.agents.get_agent(cached_id)
+                logger.debug("Reusing cached agent %s", cached_id)
+                return cached_id
+            except ResourceNotFoundError:
+                # Only a deleted agent is replaced; other errors must not leak new agents
+                logger.debug("Cached agent %s no longer exists, recreating", cached_id)
+        
+        agent_id = self.create_agent(name)
+        cache[key] = agent_id
+        _write_agent_cache(cache)
+        return agent_id
+            
     def create_conversation_thread(self) -> str:
         """
         Create a new conversation thread.
@@ -119,26 +511,37 @@ class CalendarAgent:
         """
         try:
             thread = self.project.agents.threads.create()
-            logger.debug(f"Conversation thread created with ID: {thread.id}")
+            logger.debug("Conversation thread created with ID: %s", thread.id)
             return thread.id
         except Exception as e:
-            logger.error(f"Failed to create conversation thread: {e}")
+            logger.error("Failed to create conversation thread: %s", e)
             raise
             
-    def process_message(self, thread_id: str, message: str) -> Dict[str, Any]:
+    def process_message(self, thread_id: Optional[str], message: str, verbose: bool = False) -> Dict[str, Any]:
         """
         Process a user message and return the agent's response.
         
         Args:
-            thread_id: Thread ID for the conversation
+            thread_id: Thread ID for the conversation, or None to use a default
+                thread created lazily and reused by this instance. Callers that
+                need isolated conversations must pass their own thread ID.
             message: User message
+            verbose: Echo long-running run status to stdout (the log file
+                always records it)
             
         Returns:
             Dict containing response and metadata
         """
-        logger.debug(f"Processing message in thread {thread_id}: {message[:100]}...")
-        
         try:
+            if thread_id is None:
+                if self._default_thread_id is None:
+                    with self._default_thread_lock:
+                        if self._default_thread_id is None:
+                            self._default_thread_id = self.create_conversation_thread()
+                thread_id = self._default_thread_id
+            
+            logger.debug("Processing message in thread %s: %.100s...", thread_id, message)
+            
             # Add user message to thread
             self.project.agents.messages.create(
                 thread_id=thread_id, 
@@ -146,106 +549,72 @@ class CalendarAgent:
                 content=message
             )
             
-            # Create and execute run
-            run = self.project.agents.runs.create(
-                thread_id=thread_id, 
-                agent_id=self.agent.id
-            )
-            
-            # Monitor run execution with timeout
-            max_iterations = 150  # Increased timeout for complex calendar operations
-            iterations = 0
-            
-            while run.status in ("queued", "in_progress", "requires_action") and iterations < max_iterations:
-                time.sleep(2)  # Increased polling interval
-                iterations += 1
-                run = self.project.agents.runs.get(thread_id=thread_id, run_id=run.id)
-                
-                # Log status for debugging  
-                if iterations % 5 == 0:  # Log every 10 seconds
-                    logger.debug(f"Run status after {iterations * 2}s: {run.status}")
-                    if iterations > 10:  # Only print to console after 20+ seconds to avoid spam
-                        print(f" [Status: {run.status}]", end="", flush=True)
-                
-                if run.status == "requires_action":
-                    tool_calls = run.required_action.submit_tool_outputs.tool_calls
-                    tool_outputs = self._handle_tool_calls(tool_calls)
-                    if tool_outputs:
-                        self.project.agents.runs.submit_tool_outputs(
-                            thread_id=thread_id, 
-                            run_id=run.id, 
-                            tool_outputs=tool_outputs
-                        )
-                        # Brief pause after submitting tool outputs
-                        time.sleep(1)
+            # Execute the run over an event stream; poll only if streaming is unavailable
+            start = time.monotonic()
+            run, latest_text = self._stream_run(thread_id, start + RUN_TIMEOUT_SECONDS, verbose)
+            if run is None:
+                run = self._poll_run(thread_id, start + RUN_TIMEOUT_SECONDS, verbose)
+                latest_text = None
             
             # Handle timeout
-            if iterations >= max_iterations:
-                logger.error(f"Run timed out after {iterations * 2} seconds. Final status: {run.status}")
+            if run.status in _ACTIVE_STATUSES:
+                elapsed = int(time.monotonic() - start)
+                logger.error("Run timed out after %s seconds. Final status: %s", elapsed, run.status)
                 return {
                     "status": "error",
-                    "message": f"Request timed out after {iterations * 2} seconds. Status: {run.status}",
+                    "message": f"Request timed out after {elapsed} seconds. Status: {run.status}",
                     "run_status": run.status
                 }
             
             # Check for failed run status
             if run.status == "failed":
-                logger.error(f"Run failed. Status: {run.status}")
+                logger.error("Run failed. Status: %s", run.status)
                 # Try to get error details
                 error_details = getattr(run, 'last_error', None) or getattr(run, 'error', None)
                 if error_details:
-                    logger.error(f"Error details: {error_details}")
-                    print(f"DEBUG - Error details: {error_details}")
+                    logger.error("Error details: %s", error_details)
                 
                 # Check if it's a specific error type
                 error_msg = "Run failed - possibly due to rate limiting or thread lock"
+                error_type = "unexpected"
                 if error_details:
-                    error_str = str(error_details).lower()
-                    if "rate" in error_str or "limit" in error_str:
-                        error_msg = f"Rate limit hit: {error_details}"
-                    elif "quota" in error_str or "usage" in error_str:
-                        error_msg = f"Quota/Usage limit hit: {error_details}"
-                    else:
-                        error_msg = f"Run failed: {error_details}"
+                    error_type = _classify_error(str(error_details))
+                    error_msg = f"{_RUN_FAILED_PREFIXES[error_type]}: {error_details}"
                 
                 return {
                     "status": "error",
                     "message": error_msg,
                     "run_status": run.status,
+                    "error_type": error_type,
                     "error_details": error_details
                 }
             
             # Get final response
             if run.status == "completed":
-                # Get the latest assistant message from the thread
-                messages = self.project.agents.messages.list(thread_id=thread_id, limit=50)
-                
-                # Handle both ItemPaged and direct list responses
-                if hasattr(messages, 'data'):
-                    message_list = messages.data
-                elif hasattr(messages, '__iter__'):
-                    message_list = list(messages)
-                else:
-                    message_list = []
-                
-                assistant_messages = [msg for msg in message_list if msg.role == "assistant"]
-                
-                if assistant_messages:
-                    # Get the most recent assistant message
-                    latest_message = assistant_messages[0]
+                if latest_text is None:
+                    # Polling path: fetch only the newest message produced by this run
+                    # ItemPaged is lazy, so an unsupported kwarg only fails on first iteration
+                    try:
+                        latest_message = next(iter(self.project.agents.messages.list(
+                            thread_id=thread_id, run_id=run.id, order="desc", limit=1
+                        )), None)
+                    except TypeError:
+                        # Older SDKs cannot filter by run
+                        latest_message = next(iter(self.project.agents.messages.list(
+                            thread_id=thread_id, order="desc", limit=1
+                        )), None)
                     
-                    # Extract text content from the message
-                    if hasattr(latest_message, 'content') and latest_message.content:
-                        for content_item in latest_message.content:
-                            if hasattr(content_item, 'text') and content_item.text:
-                                latest_text = content_item.text.value
-                                logger.debug("Message processed successfully")
-                                return {
-                                    "status": "success",
-                                    "message": latest_text,
-                                    "run_status": run.status,
-                                    "thread_id": thread_id
-                                }
+                    if latest_message is not None and latest_message.role == "assistant":
+                        latest_text = _message_text(latest_message)
+                
+                if latest_text is not None:
+                    logger.debug("Message processed successfully")
+                    return {
+                        "status": "success",
+                        "message": latest_text,
+                        "run_status": run.status,
+                        "thread_id": thread_id
+                    }
                 
                 logger.warning("No assistant response found")
                 return {
@@ -254,7 +623,7 @@ class CalendarAgent:
                     "run_status": run.status
                 }
             else:
-                logger.error(f"Run failed with status: {run.status}")
+                logger.error("Run failed with status: %s", run.status)
                 return {
                     "status": "error",
                     "message": f"Processing failed with status: {run.status}",
@@ -262,100 +631,199 @@ class CalendarAgent:
                 }
                     
         except Exception as e:
-            logger.error(f"Error processing message: {e}")
-            error_str = str(e).lower()
+            logger.error("Error processing message: %s", e)
+            error_text = str(e)
+            response = _ERROR_TEMPLATES[_classify_error(error_text)].copy()
+            response["error_details"] = error_text
+            return response
             
-            # Check for specific rate limit errors
-            if "rate limit" in error_str or "too many requests" in error_str or "throttle" in error_str:
-                return {
-                    "status": "error",
-                    "message": "Rate limit exceeded. Please wait and try again.",
-                    "error_details": str(e)
-                }
-            elif "quota" in error_str:
-                return {
-                    "status": "error", 
-                    "message": "Service quota exceeded. Please check your Azure AI usage.",
-                    "error_details": str(e)
-                }
+    def _stream_run(self, thread_id: str, deadline: float, verbose: bool = False) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Execute a run over the server-sent event stream.
+        
+        Tool calls are executed and submitted as soon as the run asks for them,
+        and the reply text is taken from the completed message event, so no
+        polling or follow-up message fetch is needed. The deadline is checked
+        between events; a run still active when it passes is cancelled.
+        
+        Args:
+            thread_id: Thread ID for the conversation
+            deadline: time.monotonic() value after which the run is abandoned
+            verbose: Echo status to stdout once the run takes over 20 seconds
+                (only when stdout is a terminal)
+            
+        Returns:
+            (final run, reply text), or (None, None) if streaming is not
+            supported by the installed SDK
+        """
+        runs = self.project.agents.runs
+        # Detect streaming support up front; errors during the run itself propagate
+        try:
+            handler_type = _stream_handler_type()
+        except ImportError as e:
+            logger.warning("Run streaming unavailable, falling back to polling: %s", e)
+            return None, None
+        if not hasattr(runs, "stream"):
+            logger.warning("Run streaming unavailable, falling back to polling")
+            return None, None
+        
+        handler = handler_type(self, verbose)
+        with runs.stream(
+            thread_id=thread_id, 
+            agent_id=self.agent.id, 
+            event_handler=handler
+        ) as stream:
+            for _ in stream:
+                handler.echo_status()
+                if time.monotonic() >= deadline:
+                    if handler.run is not None:
+                        logger.warning("Cancelling run %s after deadline passed", handler.run.id)
+                        runs.cancel(thread_id=thread_id, run_id=handler.run.id)
+                    break
+        return handler.run, handler.text
+        
+    def _poll_run(self, thread_id: str, deadline: float, verbose: bool = False):
+        """
+        Execute a run by polling its status until it finishes or the deadline passes.
+        
+        Args:
+            thread_id: Thread ID for the conversation
+            deadline: time.monotonic() value after which polling stops
+            verbose: Echo status to stdout once the run takes over 20 seconds
+                (only when stdout is a terminal)
+            
+        Returns:
+            The last observed run
+        """
+        run = self.project.agents.runs.create(
+            thread_id=thread_id, 
+            agent_id=self.agent.id
+        )
+        
+        start = last_log = time.monotonic()
+        delay = POLL_INITIAL_DELAY
+        # Status pings are only useful to someone watching a terminal
+        echo = verbose and sys.stdout.isatty()
+        
+        while run.status in _ACTIVE_STATUSES and time.monotonic() < deadline:
+            time.sleep(delay)
+            previous_status = run.status
+            run = self.project.agents.runs.get(thread_id=thread_id, run_id=run.id)
+            # Back off while the run sits in one state; poll fast again after a transition
+            if run.status == previous_status:
+                delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
             else:
-                return {
-                    "status": "error",
-                    "message": "An unexpected error occurred while processing your request.",
-                    "error_details": str(e)
-                }
+                delay = POLL_INITIAL_DELAY
+            
+            # Log status for debugging every STATUS_LOG_INTERVAL seconds
+            now = time.monotonic()
+            if now - last_log >= STATUS_LOG_INTERVAL:
+                last_log = now
+                elapsed = now - start
+                logger.debug("Run status after %.0fs: %s", elapsed, run.status)
+                if echo and elapsed > 20:  # Only echo after 20+ seconds to avoid spam
+                    sys.stdout.write(f" [Status: {run.status}]")
+                    sys.stdout.flush()
+            
+            if run.status == "requires_action":
+                tool_calls = run.required_action.submit_tool_outputs.tool_calls
+                tool_outputs = self._handle_tool_calls(tool_calls)
+                if tool_outputs:
+                    self.project.agents.runs.submit_tool_outputs(
+                        thread_id=thread_id, 
+                        run_id=run.id, 
+                        tool_outputs=tool_outputs
+                    )
+                # State just changed, so poll quickly again
+                delay = POLL_INITIAL_DELAY
+        
+        return run
             
     def _handle_tool_calls(self, tool_calls) -> List[Dict[str, Any]]:
         """
         Handle tool calls from the agent.
         
+        Independent calls from one requires_action step run concurrently on
+        the shared tool executor; a lone call runs inline. Each output is
+        keyed by its tool_call_id and outputs keep the order of tool_calls.
+        
         Args:
             tool_calls: List of tool calls to execute
             
         Returns:
             List of tool outputs
         """
-        outputs = []
+        if len(tool_calls) == 1:
+            return [self._execute_tool_call(tool_calls[0])]
+        return list(_TOOL_EXECUTOR.map(self._execute_tool_call, tool_calls))
         
-        for call in tool_calls:
-            try:
-                fn = call.function.name
-                args = json.loads(call.function.arguments)
-                
-                logger.debug(f"Executing tool call: {fn} with args: {list(args.keys())}")
-                
-                if fn == "read_schedule":
-                    result = read_schedule(**args)
-                    outputs.append({
-                        "tool_call_id": call.id, 
-                        "output": json.dumps(result)
-                    })
-                    
-                elif fn == "create_meeting":
-                    result = create_meeting(**args)
-                    outputs.append({
-                        "tool_call_id": call.id, 
-                        "output": json.dumps(result)
-                    })
-                    
-                elif fn == "get_current_datetime":
-                    result = get_current_datetime(**args)
-                    outputs.append({
-                        "tool_call_id": call.id, 
-                        "output": json.dumps(result)
-                    })
-                    
-                else:
-                    logger.warning(f"Unknown function called: {fn}")
-                    outputs.append({
-                        "tool_call_id": call.id, 
-                        "output": json.dumps({
-                            "error": "unknown_function", 
-                            "message": f"Function {fn} is not supported"
-                        })
-                    })
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON in function arguments: {e}")
-                outputs.append({
-                    "tool_call_id": call.id, 
-                    "output": json.dumps({
-                        "error": "invalid_arguments", 
-                        "message": "Invalid function arguments"
-                    })
+    def _execute_tool_call(self, call) -> Dict[str, Any]:
+        """
+        Execute a single tool call.
+        
+        Args:
+            call: Tool call requested by the agent
+            
+        Returns:
+            Tool output for the call
+        """
+        fn = call.function.name
+        handler = _TOOL_DISPATCH.get(fn)
+        if handler is None:
+            # Fail fast: no point parsing arguments for a function we cannot run
+            logger.warning("Unknown function called: %s", fn)
+            return {
+                "tool_call_id": call.id, 
+                "output": _dumps({
+                    "error": "unknown_function", 
+                    "message": f"Function {fn} is not supported"
                 })
-                
+            }
+            
+        try:
+            args = _loads(call.function.arguments)
+            # Raises TypeError for unknown or missing parameters (or non-object JSON)
+            _TOOL_SIGNATURES[fn].bind(**args)
+            
+        except json.JSONDecodeError as e:
+            logger.error("Invalid JSON in function arguments: %s", e)
+            result = {
+                "error": "invalid_arguments", 
+                "message": "Invalid function arguments"
+            }
+            
+        except TypeError as e:
+            logger.error("Invalid arguments for tool call %s: %s", fn, e)
+            result = {
+                "error": "invalid_arguments", 
+                "message": f"Invalid arguments for {fn}: {str(e)}"
+            }
+            
+        else:
+            logger.debug("Executing tool call: %s with args: %s", fn, list(args))
+            try:
+                result = handler(**args)
             except Exception as e:
-                logger.error(f"Error executing tool call {fn}: {e}")
-                outputs.append({
-                    "tool_call_id": call.id, 
-                    "output": json.dumps({
-                        "error": "execution_error", 
-                        "message": f"Error executing {fn}: {str(e)}"
-                    })
-                })
-                
-        return outputs
+                logger.error("Error executing tool call %s: %s", fn, e)
+                result = {
+                    "error": "execution_error", 
+                    "message": f"Error executing {fn}: {str(e)}"
+                }
+            
+        try:
+            output = _dumps(result)
+        except (TypeError, ValueError) as e:
+            # An unserializable result must not fail the whole turn
+            logger.error("Could not serialize result of tool call %s: %s", fn, e)
+            output = _dumps({
+                "error": "execution_error", 
+                "message": f"Error executing {fn}: result could not be serialized"
+            })
+            
+        return {
+            "tool_call_id": call.id, 
+            "output": output
+        }
 
     def delete_agent(self) -> bool:
         """
@@ -369,18 +837,45 @@ class CalendarAgent:
                 agent_id = self.agent.id
                 try:
                     self.project.agents.delete_agent(agent_id)
-                    logger.debug(f"Agent {agent_id} deleted successfully")
+                    logger.debug("Agent %s deleted successfully", agent_id)
+                    cache = _read_agent_cache()
+                    stale = [k for k, v in cache.items() if v == agent_id]
+                    if stale:
+                        for k in stale:
+                            del cache[k]
+                        _write_agent_cache(cache)
                     return True
                 except Exception as api_error:
-                    logger.error(f"Azure API error deleting agent {agent_id}: {api_error}")
+                    logger.error("Azure API error deleting agent %s: %s", agent_id, api_error)
                     return False
             else:
                 logger.warning("No agent to delete (self.agent is None or missing id)")
                 return False
         except Exception as e:
-            logger.error(f"General error deleting agent: {e}")
+            logger.error("General error deleting agent: %s", e)
             return False
 
+_AGENT: Optional[CalendarAgent] = None
+_AGENT_LOCK = threading.Lock()
+
+def get_agent() -> CalendarAgent:
+    """
+    Return the process-wide CalendarAgent, creating and loading it on first call.
+    
+    The instance is safe to share across threads. Each conversation should
+    pass its own thread_id to process_message: the lazily created default
+    thread is created once and shared by every caller, and a thread runs only
+    one message at a time.
+    """
+    global _AGENT
+    if _AGENT is None:
+        with _AGENT_LOCK:
+            if _AGENT is None:
+                agent = CalendarAgent()
+                agent.load_or_create_agent()
+                _AGENT = agent
+    return _AGENT
+
 def main():
     """Main function demonstrating agent usage."""
     print("Azure AI Foundry Calendar Agent - Initializing...")
@@ -391,30 +886,31 @@ def main():
         agent = CalendarAgent()
         
         # Use the project client in a single context manager for all operations
-        with agent.project:
+        with agent:
             print("Creating agent instance...")
             agent_id = agent.create_agent()
             print(f"Agent created successfully. Agent ID: {agent_id}")
             
-            # Create conversation thread
-            print("Creating conversation thread...")
-            thread_id = agent.create_conversation_thread()
-            print(f"Thread created successfully. Thread ID: {thread_id}")
-            
             # Example interactions (removed create_meeting test)
             test_messages = [
                 "What does my schedule look like next week?",
                 "Am I free next Thursday 12:00–14:00?"
             ]
             
-            print(f"\nRunning {len(test_messages)} test interactions...\n")
+            # The questions are independent, so each gets its own conversation
+            # thread and all runs execute concurrently
+            print("Creating conversation threads...")
+            thread_ids = [agent.create_conversation_thread() for _ in test_messages]
+            print(f"Threads created successfully. Thread IDs: {', '.join(thread_ids)}")
+            
+            print(f"\nRunning {len(test_messages)} test interactions concurrently...\n")
+            with ThreadPoolExecutor(max_workers=len(test_messages), thread_name_prefix="demo") as pool:
+                process = functools.partial(agent.process_message, verbose=True)
+                responses = list(pool.map(process, thread_ids, test_messages))
             
             success_count = 0
-            for i, message in enumerate(test_messages, 1):
+            for i, (message, response) in enumerate(zip(test_messages, responses), 1):
                 print(f"[{i}/{len(test_messages)}] User: {message}")
-                print("Processing request...", end=" ", flush=True)
-                
-                response = agent.process_message(thread_id, message)
                 
                 if response["status"] == "success":
                     print("✅ Success")
@@ -424,10 +920,9 @@ def main():
                     print("❌ Error")
                     print(f"Error: {response['message']}\n")
                 
-                # Add delay between requests AND ensure thread is ready
-                if i < len(test_messages):
-                    print("Waiting for thread to be ready for next request...")
-                    time.sleep(8)  # Give time for cleanup
+                # Results are already in; any pause here is purely presentational
+                if _pace and i < len(test_messages):
+                    time.sleep(_pace)
             
             # Clean up agent regardless of test results
             print("Cleaning up agent...")
@@ -445,7 +940,7 @@ def main():
             print("Demo completed. Check 'agent_operations.log' for detailed logs.")
                 
     except Exception as e:
-        logger.error(f"Main execution failed: {e}")
+        logger.error("Main execution failed: %s", e)
         print(f"❌ Failed to initialize agent: {e}")
         print("Check 'agent_operations.log' for detailed error information.")
 
@@ -9,15 +9,15 @@ Requires:
 """
 
 import os
+import copy
 import json
+import time
 import base64
+import pathlib
 import logging
-import asyncio
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
-from dotenv import load_dotenv
-
-from azure.identity import ClientSecretCredential, ManagedIdentityCredential
 
 # --- Logging setup ---
 file_handler = logging.FileHandler("calendar_agent.log")
@@ -34,10 +34,20 @@ logger.addHandler(file_handler)
 logger.addHandler(console_handler)
 
 # --- Env ---
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
+# .env is only parsed if the environment lacks the variables client-secret mode needs
+_ENV_PATH = pathlib.Path(__file__).resolve().parents[1] / ".env"
+_DOTENV_SKIP_VARS = frozenset({"GRAPH_TENANT_ID", "GRAPH_CLIENT_ID", "GRAPH_CLIENT_SECRET", "DEFAULT_USER_UPN"})
+if not all(os.environ.get(v) for v in _DOTENV_SKIP_VARS):
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_PATH)
 
 GRAPH_SCOPE_DEFAULT = "https://graph.microsoft.com/.default"
+TOKEN_REFRESH_MARGIN = 300  # seconds before expiry at which a cached token is refreshed
 USE_MI = os.getenv("USE_MANAGED_IDENTITY", "false").lower() in ("1", "true", "yes")
+# Opt-in plaintext fallback for the on-disk token cache on hosts without a keyring
+TOKEN_CACHE_ALLOW_UNENCRYPTED = os.getenv("GRAPH_TOKEN_CACHE_ALLOW_UNENCRYPTED", "false").lower() in ("1", "true", "yes")
+SCHEDULE_CACHE_TTL = float(os.getenv("SCHEDULE_CACHE_TTL", "60"))  # seconds; 0 disables the cache
+SCHEDULE_CACHE_MAX_ENTRIES = 256
 
 # Required for client secret mode
 REQUIRED_ENV_VARS = ["GRAPH_TENANT_ID", "GRAPH_CLIENT_ID", "DEFAULT_USER_UPN"]
@@ -53,7 +63,17 @@ if missing:
 REQUIRED_APP_ROLES = ["Calendars.ReadWrite", "User.Read.All"]
 OPTIONAL_APP_ROLES = ["MailboxSettings.Read"]
 
-_TOKEN_CACHE: Dict[str, Any] = {"token": None, "claims": None}
+_TOKEN_CACHE: Dict[str, Any] = {"token": None, "expires_on": 0, "claims": None}
+_TOKEN_LOCK = threading.Lock()
+_CREDENTIAL: Optional[Any] = None
+_CREDENTIAL_LOCK = threading.Lock()
+_HTTP_CLIENT: Optional[Any] = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+# Successful read_schedule results keyed by their normalized arguments: key -> (expires_at, result)
+_SCHEDULE_CACHE: Dict[tuple, tuple] = {}
+_SCHEDULE_CACHE_LOCK = threading.Lock()
+# Bumped by every clear, so reads that started before a clear are not stored
+_SCHEDULE_CACHE_GENERATION = 0
 
 def _mask(s: Optional[str], show: int = 4) -> str:
     if not s:
@@ -134,34 +154,107 @@ def _validate_iso_datetime(date_str: str) -> bool:
     except (ValueError, TypeError):
         return False
 
+def _get_credential():
+    """
+    Process-wide credential; client-secret tokens also persist in the encrypted
+    on-disk MSAL cache (plaintext only if GRAPH_TOKEN_CACHE_ALLOW_UNENCRYPTED is set).
+    """
+    global _CREDENTIAL
+    if _CREDENTIAL is None:
+        with _CREDENTIAL_LOCK:
+            if _CREDENTIAL is None:
+                # Imported here so loading the tool module stays cheap until Graph is called
+                from azure.identity import ClientSecretCredential, ManagedIdentityCredential, TokenCachePersistenceOptions
+                if USE_MI:
+                    _CREDENTIAL = ManagedIdentityCredential()
+                else:
+                    _CREDENTIAL = ClientSecretCredential(
+                        tenant_id=os.environ["GRAPH_TENANT_ID"],
+                        client_id=os.environ["GRAPH_CLIENT_ID"],
+                        client_secret=os.environ["GRAPH_CLIENT_SECRET"],
+                        cache_persistence_options=TokenCachePersistenceOptions(
+                            name="vspoc", allow_unencrypted_storage=TOKEN_CACHE_ALLOW_UNENCRYPTED
+                        ),
+                    )
+    return _CREDENTIAL
+
+def _schedule_cache_get(key: tuple) -> Optional[Dict[str, Any]]:
+    with _SCHEDULE_CACHE_LOCK:
+        entry = _SCHEDULE_CACHE.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _SCHEDULE_CACHE[key]
+            return None
+        # Callers get their own copy so they cannot alter the cached result
+        return copy.deepcopy(entry[1])
+
+def _schedule_cache_generation() -> int:
+    with _SCHEDULE_CACHE_LOCK:
+        return _SCHEDULE_CACHE_GENERATION
+
+def _schedule_cache_put(key: tuple, result: Dict[str, Any], generation: int) -> None:
+    with _SCHEDULE_CACHE_LOCK:
+        if generation != _SCHEDULE_CACHE_GENERATION:
+            # A meeting was created while this read was in flight; the result may be stale
+            return
+        if len(_SCHEDULE_CACHE) >= SCHEDULE_CACHE_MAX_ENTRIES:
+            # Drop the oldest entry (dicts keep insertion order)
+            del _SCHEDULE_CACHE[next(iter(_SCHEDULE_CACHE))]
+        _SCHEDULE_CACHE[key] = (time.monotonic() + SCHEDULE_CACHE_TTL, copy.deepcopy(result))
+
+def _schedule_cache_clear() -> None:
+    global _SCHEDULE_CACHE_GENERATION
+    with _SCHEDULE_CACHE_LOCK:
+        _SCHEDULE_CACHE_GENERATION += 1
+        _SCHEDULE_CACHE.clear()
+
+def _http_client():
+    """Shared Graph HTTP client, so calls reuse pooled keep-alive TLS connections."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        with _HTTP_CLIENT_LOCK:
+            if _HTTP_CLIENT is None:
+                import httpx
+                _HTTP_CLIENT = httpx.Client(
+                    timeout=30.0,
+                    transport=httpx.HTTPTransport(
+                        limits=httpx.Limits(
+                            max_connections=50, max_keepalive_connections=20, keepalive_expiry=30.0
+                        ),
+                        retries=3,
+                    ),
+                )
+    return _HTTP_CLIENT
+
 def _get_app_token() -> str:
     """Acquire an app-only Graph token; print identity/roles the first time."""
-    if _TOKEN_CACHE["token"]:
+    if _TOKEN_CACHE["token"] and _TOKEN_CACHE["expires_on"] - time.time() >= TOKEN_REFRESH_MARGIN:
         return _TOKEN_CACHE["token"]
 
-    if USE_MI:
-        cred = ManagedIdentityCredential()
-    else:
-        cred = ClientSecretCredential(
-            tenant_id=os.environ["GRAPH_TENANT_ID"],
-            client_id=os.environ["GRAPH_CLIENT_ID"],
-            client_secret=os.environ["GRAPH_CLIENT_SECRET"],
-        )
-    
-    print(f"Requesting token with scope: {GRAPH_SCOPE_DEFAULT}")
-    print(f"Tenant ID: {os.environ['GRAPH_TENANT_ID']}")
-    print(f"Client ID: {os.environ['GRAPH_CLIENT_ID']}")
-    
-    token_response = cred.get_token(GRAPH_SCOPE_DEFAULT)
-    token = token_response.token
+    with _TOKEN_LOCK:
+        # Another thread may have refreshed the token while we waited
+        if _TOKEN_CACHE["token"] and _TOKEN_CACHE["expires_on"] - time.time() >= TOKEN_REFRESH_MARGIN:
+            return _TOKEN_CACHE["token"]
+
+        cred = _get_credential()
+        
+        print(f"Requesting token with scope: {GRAPH_SCOPE_DEFAULT}")
+        print(f"Tenant ID: {os.environ['GRAPH_TENANT_ID']}")
+        print(f"Client ID: {os.environ['GRAPH_CLIENT_ID']}")
+        
+        token_response = cred.get_token(GRAPH_SCOPE_DEFAULT)
+        token = token_response.token
 
-    # Decode and print once
-    claims = _decode_jwt(token) or {}
-    _print_config_once(claims)
+        # Decode and print once
+        claims = _decode_jwt(token) or {}
+        if _TOKEN_CACHE["claims"] is None:
+            _print_config_once(claims)
 
-    _TOKEN_CACHE["token"] = token
-    _TOKEN_CACHE["claims"] = claims
-    return token
+        _TOKEN_CACHE["token"] = token
+        _TOKEN_CACHE["expires_on"] = token_response.expires_on
+        _TOKEN_CACHE["claims"] = claims
+        return token
 
 # ---------------------- Public API ---------------------- #
 
@@ -176,6 +269,8 @@ def read_schedule(
     """
     Returns events in [start_iso, end_iso] for the user's default calendar.
     App-only permission: always targets /users/{UPN}/calendarView (never /me).
+    Successful results for an explicit window are cached for SCHEDULE_CACHE_TTL
+    seconds; create_meeting clears the cache.
     """
     logger.debug(f"Reading schedule for user: {user_upn or 'default'}")
     try:
@@ -183,6 +278,9 @@ def read_schedule(
         if not user:
             raise ValueError("user_upn is required")
 
+        # A defaulted window moves with the clock, so only explicit windows are cacheable
+        cacheable = SCHEDULE_CACHE_TTL > 0 and bool(start_iso and end_iso)
+
         now_utc = datetime.now(timezone.utc)
         if not start_iso or not end_iso:
             start_iso = now_utc.isoformat()
@@ -195,7 +293,18 @@ def read_schedule(
             raise ValueError("top must be a positive integer <= 1000")
 
         tz = timezone_name or _tz()
-        return asyncio.run(_read_schedule_async(user, start_iso, end_iso, tz, select, top))
+        key = (user, start_iso, end_iso, tz, tuple(select) if select else None, top)
+        if cacheable:
+            cached = _schedule_cache_get(key)
+            if cached is not None:
+                logger.debug("Returning cached schedule")
+                return cached
+            generation = _schedule_cache_generation()
+
+        result = _read_schedule_graph(user, start_iso, end_iso, tz, select, top)
+        if cacheable and "error" not in result:
+            _schedule_cache_put(key, result, generation)
+        return result
 
     except ValueError as e:
         logger.error(f"Validation error in read_schedule: {e}")
@@ -204,7 +313,7 @@ def read_schedule(
         logger.error(f"Unexpected error in read_schedule: {e}")
         return {"error": "unexpected_error", "message": "An unexpected error occurred"}
 
-async def _read_schedule_async(
+def _read_schedule_graph(
     user: str,
     start_iso: str,
     end_iso: str,
@@ -254,7 +363,6 @@ async def _read_schedule_async(
         print(f"API Call: GET {url}")
         print(f"Timezone: {tz}")
 
-        import httpx
         access_token = _get_app_token()
         headers = {
             "Authorization": f"Bearer {access_token}",
@@ -262,33 +370,32 @@ async def _read_schedule_async(
             "Prefer": f'outlook.timezone="{tz}"',
         }
 
-        async with httpx.AsyncClient(timeout=30.0) as http_client:  # Add timeout
-            resp = await http_client.get(url, headers=headers)
+        resp = _http_client().get(url, headers=headers)
             
-            if resp.status_code == 200:
-                data = resp.json()
-                logger.debug(f"Retrieved {len(data.get('value', []))} events")
-                return data
+        if resp.status_code == 200:
+            data = resp.json()
+            logger.debug(f"Retrieved {len(data.get('value', []))} events")
+            return data
 
-            # Enhanced error handling with specific Graph API codes
-            logger.error(f"HTTP {resp.status_code}: {resp.text}")
+        # Enhanced error handling with specific Graph API codes
+        logger.error(f"HTTP {resp.status_code}: {resp.text}")
             
-            # Don't spam console with common format errors
-            if resp.status_code != 400:
-                print(f"ERROR: HTTP {resp.status_code}: {resp.text}")
+        # Don't spam console with common format errors
+        if resp.status_code != 400:
+            print(f"ERROR: HTTP {resp.status_code}: {resp.text}")
             
-            if resp.status_code == 429:  # Too Many Requests
-                retry_after = resp.headers.get('Retry-After', 'unknown')
-                return {"error": "rate_limit_exceeded", "message": f"Graph API rate limit exceeded. Retry after: {retry_after} seconds"}
-            if resp.status_code == 403:
-                return {"error": "permission_denied", "message": "App lacks required Application permissions."}
-            if resp.status_code == 401:
-                return {"error": "authentication_failed", "message": "Authentication failed. Check credentials."}
-            if resp.status_code == 404:
-                return {"error": "user_not_found", "message": f"User {user} not found."}
-            if resp.status_code == 503:  # Service Unavailable
-                return {"error": "service_unavailable", "message": "Graph API service temporarily unavailable"}
-            return {"error": "graph_api_error", "message": f"Graph API error {resp.status_code}: {resp.text}"}
+        if resp.status_code == 429:  # Too Many Requests
+            retry_after = resp.headers.get('Retry-After', 'unknown')
+            return {"error": "rate_limit_exceeded", "message": f"Graph API rate limit exceeded. Retry after: {retry_after} seconds"}
+        if resp.status_code == 403:
+            return {"error": "permission_denied", "message": "App lacks required Application permissions."}
+        if resp.status_code == 401:
+            return {"error": "authentication_failed", "message": "Authentication failed. Check credentials."}
+        if resp.status_code == 404:
+            return {"error": "user_not_found", "message": f"User {user} not found."}
+        if resp.status_code == 503:  # Service Unavailable
+            return {"error": "service_unavailable", "message": "Graph API service temporarily unavailable"}
+        return {"error": "graph_api_error", "message": f"Graph API error {resp.status_code}: {resp.text}"}
 
     except Exception as e:
         logger.error(f"Unexpected error in calendar reading: {e}")
@@ -335,19 +442,17 @@ def create_meeting(
                 raise ValueError(f"Invalid email addresses: {bad}")
 
         tz = timezone_name or _tz()
-        return asyncio.run(
-            _create_meeting_async(
-                user,
-                subject,
-                start_iso,
-                end_iso,
-                tz,
-                attendees,
-                body_html,
-                location,
-                allow_new_time_proposals,
-                is_online_meeting,
-            )
+        return _create_meeting_graph(
+            user,
+            subject,
+            start_iso,
+            end_iso,
+            tz,
+            attendees,
+            body_html,
+            location,
+            allow_new_time_proposals,
+            is_online_meeting,
         )
 
     except ValueError as e:
@@ -357,7 +462,7 @@ def create_meeting(
         logger.error(f"Unexpected error in create_meeting: {e}")
         return {"error": "unexpected_error", "message": "An unexpected error occurred"}
 
-async def _create_meeting_async(
+def _create_meeting_graph(
     user: str,
     subject: str,
     start_iso: str,
@@ -390,33 +495,33 @@ async def _create_meeting_async(
         print(f"API Call: POST {url}")
         print(f"Meeting Subject: {subject}")
 
-        import httpx
         access_token = _get_app_token()
         headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
 
-        async with httpx.AsyncClient() as http_client:
-            resp = await http_client.post(url, headers=headers, json=event)
-            if resp.status_code == 201:
-                created = resp.json()
-                print(f"Event created successfully: {created.get('id')}")
-                return {
-                    "status": "created",
-                    "eventId": created.get("id"),
-                    "webLink": created.get("webLink"),
-                    "subject": subject,
-                }
-
-            logger.error(f"HTTP {resp.status_code}: {resp.text}")
-            print(f"HTTP Error {resp.status_code}: {resp.text}")
-            if resp.status_code == 403:
-                return {"error": "permission_denied", "message": "App lacks Calendars.ReadWrite (Application)."}
-            if resp.status_code == 401:
-                return {"error": "authentication_failed", "message": "Authentication failed. Check credentials."}
-            if resp.status_code == 404:
-                return {"error": "user_not_found", "message": f"User {user} not found."}
-            if resp.status_code == 400:
-                return {"error": "bad_request", "message": "Invalid meeting parameters."}
-            return {"error": "graph_api_error", "message": f"Graph API error {resp.status_code}: {resp.text}"}
+        resp = _http_client().post(url, headers=headers, json=event)
+        if resp.status_code == 201:
+            # Any cached calendar view may now be missing this event
+            _schedule_cache_clear()
+            created = resp.json()
+            print(f"Event created successfully: {created.get('id')}")
+            return {
+                "status": "created",
+                "eventId": created.get("id"),
+                "webLink": created.get("webLink"),
+                "subject": subject,
+            }
+
+        logger.error(f"HTTP {resp.status_code}: {resp.text}")
+        print(f"HTTP Error {resp.status_code}: {resp.text}")
+        if resp.status_code == 403:
+            return {"error": "permission_denied", "message": "App lacks Calendars.ReadWrite (Application)."}
+        if resp.status_code == 401:
+            return {"error": "authentication_failed", "message": "Authentication failed. Check credentials."}
+        if resp.status_code == 404:
+            return {"error": "user_not_found", "message": f"User {user} not found."}
+        if resp.status_code == 400:
+            return {"error": "bad_request", "message": "Invalid meeting parameters."}
+        return {"error": "graph_api_error", "message": f"Graph API error {resp.status_code}: {resp.text}"}
 
     except Exception as e:
         logger.error(f"Unexpected error in meeting creation: {e}")
@@ -64,17 +64,8 @@ def print_welcome():
     print("=" * 60)
 
 def signal_handler(sig, frame):
-    """Handle Ctrl+C gracefully."""
-    print("\n\n👋 Goodbye! Attempting agent cleanup...")
-    try:
-        global _agent_ref
-        if _agent_ref:
-            if _agent_ref.delete_agent():
-                print("✅ Agent deleted successfully.")
-            else:
-                print("⚠️  Agent deletion failed - check logs.")
-    except Exception as cleanup_error:
-        print(f"❌ Error during agent cleanup: {cleanup_error}")
+    """Handle Ctrl+C gracefully. The agent is kept so the next session can reuse it."""
+    print("\n\n👋 Goodbye!")
     sys.exit(0)
 
 def main():
@@ -93,9 +84,9 @@ def main():
         _agent_ref = CalendarAgent()
         
         # Create agent and thread
-        with _agent_ref.project:
-            agent_id = _agent_ref.create_agent()
-            print(f"✅ Agent created: {agent_id}")
+        with _agent_ref:
+            agent_id = _agent_ref.load_or_create_agent()
+            print(f"✅ Agent ready: {agent_id}")
             
             thread_id = _agent_ref.create_conversation_thread()
             print(f"✅ Thread created: {thread_id}")
@@ -118,7 +109,7 @@ def main():
                     
                     # Process message
                     print("🔄 Processing...", end=" ", flush=True)
-                    response = _agent_ref.process_message(thread_id, user_input)
+                    response = _agent_ref.process_message(thread_id, user_input, verbose=True)
                     
                     if response["status"] == "success":
                         print("✅")
@@ -136,12 +127,7 @@ def main():
                     print("\n👋 Session interrupted.")
                     break
             
-            # Cleanup
-            print("\n🧹 Cleaning up...")
-            if _agent_ref.delete_agent():
-                print("✅ Cleanup completed.")
-            else:
-                print("⚠️  Cleanup failed - check logs.")
+            # The agent is left in place for reuse by the next session
             print("📝 Check 'agent_operations.log' for detailed logs.")
             print("=" * 60)
     